@@ -1,50 +1,170 @@
 import re
-from typing import List, Tuple, Dict, Optional
-from youtube_comment_downloader import YoutubeCommentDownloader
+import argparse
+import json
+import logging
+import os
+from collections import defaultdict
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterator, List, Sequence, Tuple, Dict, Optional
+from youtube_comment_downloader import SORT_BY_POPULAR, SORT_BY_RECENT, YoutubeCommentDownloader
 import time
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+import queue
+import threading
 import signal
 import sys
 
-# Strict currency patterns - symbol based only
+logger = logging.getLogger(__name__)
+LOG_FORMAT = "%(message)s"
+
+# Settings live in config.json next to this module; these defaults cover any
+# keys it leaves out
+CONFIG_PATH = Path(__file__).with_name('config.json')
+DEFAULT_CONFIG = {
+    'max_workers': None,  # None means one worker process per CPU core
+    'batch_size': 1000,
+    'max_comments': 50000,  # 0 or None fetches every comment
+    'sort_by': 'popular',
+    'max_usd_amount': 1000,
+    'max_inr_amount': 10000,
+    'max_eur_amount': 1000,
+    'exchange_rate_api': 'https://open.er-api.com/v6/latest/USD'
+}
+
+def load_config(path: Path = CONFIG_PATH) -> dict:
+    """Load settings from config.json, falling back to defaults"""
+    config = dict(DEFAULT_CONFIG)
+    try:
+        config.update(json.loads(path.read_text(encoding='utf-8')))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Using default configuration due to error: {str(e)}")
+    return config
+
+CONFIG = load_config()
+
+# Amounts from 1900 to 2100 are almost always years ("$2024"), so they are
+# rejected by a lookahead right after the symbol instead of after parsing
+NOT_YEAR = r'(?!0*(?:(?:19|20)\d{2}(?:\.\d{1,2})?|2100(?:\.0{1,2})?)(?![.,]?\d|[kKmM]\b))'
+
+# Strict currency patterns - symbol based only, keyed by the named group
+# that captures the amount. Amounts are bounded to 7 digits and may not run
+# on into more digits, so the engine never backtracks through long digit runs
+# such as timestamps or IDs. An amount may end at whitespace, the end of the
+# text, or punctuation ("$5!", "$5, thanks"), including a dot or comma not
+# followed by a digit ("I sent $5."). A dot or comma followed by a digit
+# ("$1,000") or a k/M unit ("$5k") means the amount is cut off, so there is
+# no match.
 CURRENCY_PATTERNS = {
     # USD - Must have $ symbol directly attached to number
-    r'\$(\d+(?:\.\d+)?)(?:\s|$)': ('USD', 10000, '$'),
+    'USD': (r'\$' + NOT_YEAR + r'(?P<USD>\d{1,7}(?:\.\d{1,2})?)(?![.,]?\d|[kKmM]\b)', 'USD', 10000, '$'),
     
     # INR - Must have ₹ symbol directly attached to number
-    r'₹(\d+(?:\.\d+)?)(?:\s|$)': ('INR', 100000, '₹'),
+    'INR': (r'₹' + NOT_YEAR + r'(?P<INR>\d{1,7}(?:\.\d{1,2})?)(?![.,]?\d|[kKmM]\b)', 'INR', 100000, '₹'),
     
     # EUR - Handle both formats properly
-    r'€(\d+(?:\.\d+)?)(?:\s|$)': ('EUR', 10000, '€'),
-    r'(\d+(?:\.\d+)?)\s*€(?:\s|$)': ('EUR', 10000, '€')
+    'EUR': (r'€' + NOT_YEAR + r'(?P<EUR>\d{1,7}(?:\.\d{1,2})?)(?![.,]?\d|[kKmM]\b)', 'EUR', 10000, '€'),
+    # Suffix form only starts a number where no digit or separator precedes it, and must be
+    # followed by whitespace or the end of the text
+    'EUR_SUFFIX': (r'(?<![\d.,])' + NOT_YEAR + r'(?P<EUR_SUFFIX>\d{1,7}(?:\.\d{1,2})?)\s?€(?!\S)', 'EUR', 10000, '€')
+}
+
+# Patterns compiled per symbol. str.find locates the symbols and the regex only
+# runs at those positions: prefix patterns start at the symbol, suffix patterns
+# end at it.
+PREFIX_PATTERNS = {
+    symbol: (re.compile(pattern), currency)
+    for name, (pattern, currency, _, symbol) in CURRENCY_PATTERNS.items()
+    if not name.endswith('_SUFFIX')
 }
+SUFFIX_PATTERNS = {
+    symbol: (re.compile(pattern), currency)
+    for name, (pattern, currency, _, symbol) in CURRENCY_PATTERNS.items()
+    if name.endswith('_SUFFIX')
+}
+
+# Longest amount a suffix pattern can match before its symbol ("1234567.89 ")
+AMOUNT_WINDOW = 11
+
+# Every pattern needs one of these symbols
+SYMBOL_SET = frozenset(symbol for *_, symbol in CURRENCY_PATTERNS.values())
+# process_comment_batch spells these out for a fast substring pre-check, so a
+# new currency must be added there too or its comments are silently skipped
+assert SYMBOL_SET == frozenset('$₹€'), "update the symbol pre-check in process_comment_batch"
+
+# Comment orders accepted by the 'sort_by' setting
+SORT_ORDERS = {'popular': SORT_BY_POPULAR, 'recent': SORT_BY_RECENT}
 
 # Maximum reasonable amounts per currency
 MAX_AMOUNTS = {
-    'USD': 1000,  # Most donations are under $1000
-    'INR': 10000, # Most donations are under ₹10000
-    'EUR': 1000   # Most donations are under €1000
+    'USD': CONFIG['max_usd_amount'],
+    'INR': CONFIG['max_inr_amount'],
+    'EUR': CONFIG['max_eur_amount']
 }
 
+# Shared HTTP session so repeated requests reuse the pooled connection
+HTTP_SESSION = requests.Session()
+
+# Exchange rates are cached on disk and reused for a day
+RATES_CACHE_PATH = Path.home() / '.cache' / 'donation_analyzer' / 'rates.json'
+RATES_CACHE_TTL = 24 * 60 * 60  # seconds
+
 def signal_handler(signum, frame):
     print("\nStopping comment collection...")
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
 
-def get_exchange_rates() -> Dict[str, float]:
-    """Get current exchange rates from ExchangeRate-API with fallback"""
+def init_worker(log_level: int = logging.WARNING):
+    """Ignore Ctrl+C in worker processes so only the parent handles it"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Spawned workers start without the parent's logging setup, so pass the
+    # level on; with fork this is a no-op since the handlers are inherited
+    logging.basicConfig(level=log_level, format=LOG_FORMAT)
+
+def load_cached_rates() -> Optional[Dict[str, float]]:
+    """Load exchange rates from the disk cache if they are still fresh"""
+    try:
+        cache = json.loads(RATES_CACHE_PATH.read_text())
+        if time.time() - cache['fetched_at'] < RATES_CACHE_TTL:
+            return cache['rates']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def save_cached_rates(rates: Dict[str, float]) -> None:
+    """Write exchange rates to the disk cache"""
+    try:
+        RATES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a per-process temp file and rename it into place, so other
+        # runs never read a half-written cache
+        tmp_path = RATES_CACHE_PATH.with_name(f"{RATES_CACHE_PATH.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({'fetched_at': time.time(), 'rates': rates}))
+        os.replace(tmp_path, RATES_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: Could not cache exchange rates: {str(e)}")
+
+def get_exchange_rates(refresh: bool = False) -> Dict[str, float]:
+    """Get current exchange rates from cache or ExchangeRate-API with fallback"""
+    if not refresh:
+        rates = load_cached_rates()
+        if rates:
+            print("Using cached exchange rates...")
+            return rates
+    
     try:
         print("Fetching current exchange rates...")
-        response = requests.get('https://open.er-api.com/v6/latest/USD', timeout=10)
+        response = HTTP_SESSION.get(CONFIG['exchange_rate_api'], timeout=(3, 10))  # connect, read
         data = response.json()
         if 'rates' in data and 'INR' in data['rates'] and 'EUR' in data['rates']:
-            return {
+            rates = {
                 'USD': 1.0,
                 'INR': data['rates']['INR'],
                 'EUR': 1/data['rates']['EUR']  # Convert EUR rate to USD
             }
+            save_cached_rates(rates)
+            return rates
         raise ValueError("Invalid response format")
     except Exception as e:
         print(f"Warning: Using fallback exchange rates due to error: {str(e)}")
@@ -54,134 +174,239 @@ def is_reasonable_amount(amount: float, currency: str) -> bool:
     """Check if donation amount is reasonable for the currency"""
     if amount <= 0:
         return False
-    if 1900 <= amount <= 2100:  # Avoid year numbers
-        return False
     return amount <= MAX_AMOUNTS.get(currency, 1000)
 
 def extract_amount(match: re.Match) -> float:
-    """Extract and validate amount from regex match"""
-    try:
-        # Get the first non-None group (amount)
-        amount_str = next((g for g in match.groups() if g is not None), None)
-        if not amount_str:
-            return 0.0
-        amount = float(amount_str)
-        return amount if amount > 0 else 0.0
-    except (ValueError, TypeError, StopIteration):
-        return 0.0
-
-def process_comment_batch(comments: List[dict], batch_num: int) -> List[Tuple[float, str, str, str]]:
-    """Process a batch of comments for donations with strict validation"""
+    """Extract the amount from a regex match"""
+    # The named group that matched holds the amount, and the pattern already
+    # guarantees it is 1-7 digits with at most two decimals, so float() can't fail
+    return float(match.group(match.lastgroup))
+
+def find_symbols(text: str) -> List[int]:
+    """Find the positions of all currency symbols in text, in order"""
+    positions = []
+    for symbol in SYMBOL_SET:
+        idx = text.find(symbol)
+        while idx != -1:
+            positions.append(idx)
+            idx = text.find(symbol, idx + 1)
+    positions.sort()
+    return positions
+
+def find_donations(text: str) -> Iterator[Tuple[re.Match, str, str]]:
+    """Yield (match, currency, symbol) for each donation, running the regex only at symbol positions"""
+    last_end = 0  # Matches never overlap, like a single finditer pass
+    for idx in find_symbols(text):
+        if idx < last_end:
+            continue
+        
+        symbol = text[idx]
+        match = None
+        if symbol in PREFIX_PATTERNS:
+            regex, currency = PREFIX_PATTERNS[symbol]
+            match = regex.match(text, idx)
+        if match is None and symbol in SUFFIX_PATTERNS:
+            regex, currency = SUFFIX_PATTERNS[symbol]
+            # endpos is one past the symbol so the trailing lookahead still sees
+            # the next character instead of treating the window end as $
+            match = regex.search(text, max(last_end, idx - AMOUNT_WINDOW), idx + 2)
+        
+        if match:
+            last_end = match.end()
+            yield match, currency, symbol
+
+def process_comment_batch(texts: Sequence[str], authors: Sequence[str], batch_num: int
+                          ) -> Tuple[List[Tuple[float, str, str, str]], Dict[str, float]]:
+    """Process a batch of comment texts and their authors for donations with strict validation
+    
+    Returns the donations along with the batch's total per currency, summed
+    here in the worker so the parent only merges a few numbers per batch.
+    """
     try:
         donations = []
+        totals = defaultdict(float)
+        # Local names are cheaper to look up than globals and attributes in
+        # the per-comment loop
+        append = donations.append
+        find = find_donations
+        # Check the log level once per batch instead of once per donation
+        log_donations = logger.isEnabledFor(logging.DEBUG)
+        # Repeat donors share one author string, which pickle then sends once
+        seen_authors = {}
         
-        for comment in comments:
-            try:
-                if not isinstance(comment, dict) or 'text' not in comment or 'author' not in comment:
-                    continue
-                    
-                text = comment['text']
-                author = comment['author']
-                
-                # Skip likely spam or invalid comments
-                if not text or len(text) > 500 or not author:
-                    continue
-                
-                # Process each currency pattern
-                for pattern, (currency, _, symbol) in CURRENCY_PATTERNS.items():
-                    matches = re.finditer(pattern, text)  # Case sensitive for symbols
-                    for match in matches:
-                        amount = extract_amount(match)
-                        if amount > 0 and is_reasonable_amount(amount, currency):
-                            donations.append((amount, currency, match.group(0).strip(), author))
-                            print(f"Found {currency} {amount:.2f} from {author}")
-                
-            except Exception as e:
-                print(f"Warning: Error processing comment: {str(e)}")
+        # Comments are validated on the fetch side, so nothing per comment
+        # needs its own try/except; a failure drops the whole batch below
+        for text, author in zip(texts, authors):
+            # Skip likely spam or invalid comments
+            if not text or len(text) > 500 or not author:
+                continue
+            
+            # Cheap check before running the regex at all. str's substring
+            # search is far faster than isdisjoint(), which hashes every
+            # character; SYMBOL_SET is checked against these at import
+            if '$' not in text and '₹' not in text and '€' not in text:
                 continue
+            
+            for match, currency, symbol in find(text):
+                amount = extract_amount(match)
+                if amount > 0 and is_reasonable_amount(amount, currency):
+                    # Matches start at a digit or symbol and end at one, so no strip()
+                    author = seen_authors.setdefault(author, author)
+                    append((amount, currency, match.group(0), author))
+                    totals[currency] += amount
+                    if log_donations:
+                        logger.debug("Found %s %.2f from %s", currency, amount, author)
         
-        return donations
+        return donations, totals
         
     except Exception as e:
         print(f"Error processing batch {batch_num}: {str(e)}")
-        return []
+        return [], {}
+
+def iter_comments(downloader: YoutubeCommentDownloader, url: str, sort_by: int) -> Iterator[Tuple[str, str]]:
+    """Yield (text, author) for each valid comment, ending quietly if fetching fails"""
+    try:
+        # Only text and author are needed, so whole comment dicts are dropped here
+        for comment in downloader.get_comments_from_url(url, sort_by=sort_by):
+            if isinstance(comment, dict) and isinstance(comment.get('text'), str) and 'author' in comment:
+                yield comment['text'], comment['author']
+    except Exception as e:
+        print(f"Error fetching comments: {str(e)}")
 
-def get_video_comments(url: str) -> List[Tuple[float, str, str, str]]:
-    """Fetch and process comments with improved error handling"""
+def fetch_comments(downloader: YoutubeCommentDownloader, url: str, batch_queue: queue.Queue, batch_size: int,
+                   sort_by: int = SORT_BY_POPULAR, max_comments: Optional[int] = None) -> None:
+    """Push batches of (texts, authors) onto the queue from a producer thread, then a None sentinel"""
+    comments = iter_comments(downloader, url, sort_by)
+    if max_comments:
+        # Stop pulling pages from YouTube once the limit is reached
+        comments = islice(comments, max_comments)
+    try:
+        # islice cuts each batch in C rather than counting comments in Python;
+        # iter() stops at the first empty batch
+        for batch in iter(lambda: list(islice(comments, batch_size)), []):
+            texts, authors = zip(*batch)
+            batch_queue.put((texts, authors))
+    finally:
+        batch_queue.put(None)
+
+def write_donations(path: Path, donation_queue: queue.Queue) -> None:
+    """Write batches of donations from the queue to a JSONL file until a None sentinel"""
+    # json.dumps with non-default options builds a new encoder on every call,
+    # so build one up front and reuse it for every record
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    try:
+        with path.open('w', encoding='utf-8') as f:
+            for donations in iter(donation_queue.get, None):
+                f.write(''.join(
+                    encode({'amount': amount, 'currency': currency, 'original': original, 'author': author}) + '\n'
+                    for amount, currency, original, author in donations
+                ))
+    except OSError as e:
+        print(f"Error writing donations to {path}: {str(e)}")
+        # Keep draining so the analysis can still finish
+        for _ in iter(donation_queue.get, None):
+            pass
+
+def collect_batch_result(future: Future, handle_donations: Callable[[List[Tuple[float, str, str, str]]], None],
+                         currency_totals: Dict[str, float]) -> int:
+    """Add a finished batch to the running totals and pass its donations on, returning how many it found"""
+    try:
+        donations, batch_totals = future.result()
+        if donations:
+            for currency, total in batch_totals.items():
+                currency_totals[currency] += total
+            handle_donations(donations)
+            return len(donations)
+    except Exception as e:
+        print(f"Warning: Error processing batch: {str(e)}")
+    return 0
+
+def get_video_comments(url: str, stream_output: Optional[Path] = None
+                       ) -> Tuple[List[Tuple[float, str, str, str]], Dict[str, float], int]:
+    """Fetch and process comments with improved error handling
+    
+    Returns the donations, the total amount per currency and the number of
+    donations found. With stream_output set, donations are written to that
+    JSONL file as they are found instead of being kept in memory, so the
+    returned list is empty.
+    """
+    all_donations = []
+    currency_totals = defaultdict(float)
+    donation_count = 0
+    writer = None
     try:
         print(f"\nFetching comments from: {url}")
         downloader = YoutubeCommentDownloader()
         count = 0
-        batch = []
-        batch_size = 1000
-        all_donations = []
+        batch_size = CONFIG['batch_size']
+        max_workers = CONFIG['max_workers'] or os.cpu_count() or 1
+        if sys.platform == 'win32':
+            # ProcessPoolExecutor refuses more than 61 workers on Windows
+            max_workers = min(max_workers, 61)
+        max_comments = CONFIG['max_comments']
+        sort_by = SORT_ORDERS.get(CONFIG['sort_by'])
+        if sort_by is None:
+            print(f"Warning: Unknown sort_by '{CONFIG['sort_by']}', using 'popular' instead")
+            sort_by = SORT_BY_POPULAR
         batch_num = 0
         start_time = time.time()
         
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
+        if stream_output:
+            donation_queue = queue.Queue()
+            writer = threading.Thread(target=write_donations, args=(stream_output, donation_queue))
+            writer.start()
+            handle_donations = donation_queue.put
+        else:
+            handle_donations = all_donations.extend
+        
+        # Fetch and batch on a separate thread so network I/O overlaps batch
+        # processing; the bounded queue keeps memory flat if fetching outpaces
+        # processing
+        batch_queue = queue.Queue(maxsize=8)
+        producer = threading.Thread(target=fetch_comments,
+                                    args=(downloader, url, batch_queue, batch_size, sort_by, max_comments), daemon=True)
+        producer.start()
+        
+        # Regex matching is CPU bound, so use processes to get past the GIL
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                 initargs=(logger.getEffectiveLevel(),)) as executor:
+            futures = set()
+            max_in_flight = 2 * max_workers
             
             try:
-                # Simpler comment fetching approach
-                for comment in downloader.get_comments_from_url(url):
-                    if not comment:
-                        continue
-                        
-                    if isinstance(comment, dict) and 'text' in comment and 'author' in comment:
-                        batch.append(comment)
-                        count += 1
-                        
-                        if count % 1000 == 0:
-                            elapsed = time.time() - start_time
-                            rate = count / elapsed if elapsed > 0 else 0
-                            print(f"Processed {count} comments... ({rate:.1f} comments/sec)")
-                        
-                        if len(batch) >= batch_size:
-                            batch_num += 1
-                            futures.append(executor.submit(process_comment_batch, batch.copy(), batch_num))
-                            batch = []
-                            
-                            # Process completed futures
-                            for future in list(as_completed(futures)):
-                                try:
-                                    result = future.result(timeout=10)
-                                    if result:
-                                        all_donations.extend(result)
-                                    futures.remove(future)
-                                except TimeoutError:
-                                    print(f"Warning: Batch {batch_num} timed out, skipping...")
-                                    futures.remove(future)
-                                except Exception as e:
-                                    print(f"Warning: Error processing batch: {str(e)}")
-                                    futures.remove(future)
-                
-                # Process remaining batch
-                if batch:
+                for texts, authors in iter(batch_queue.get, None):
                     batch_num += 1
-                    futures.append(executor.submit(process_comment_batch, batch, batch_num))
+                    futures.add(executor.submit(process_comment_batch, texts, authors, batch_num))
+                    
+                    count += len(texts)
+                    elapsed = time.time() - start_time
+                    rate = count / elapsed if elapsed > 0 else 0
+                    print(f"Processed {count} comments... ({rate:.1f} comments/sec)")
                     
-                    for future in as_completed(futures):
-                        try:
-                            result = future.result(timeout=10)
-                            if result:
-                                all_donations.extend(result)
-                        except TimeoutError:
-                            print("Warning: Final batch processing timed out")
-                        except Exception as e:
-                            print(f"Warning: Error in final batch: {str(e)}")
+                    # Collect finished batches without waiting on the rest, unless
+                    # too many are in flight; blocking here also backs up the
+                    # batch queue, so memory stays bounded end to end
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED,
+                                         timeout=None if len(futures) >= max_in_flight else 0)
+                    for future in done:
+                        donation_count += collect_batch_result(future, handle_donations, currency_totals)
+                
+                # Fetching is done, so now wait for the batches still running
+                for future in as_completed(futures):
+                    donation_count += collect_batch_result(future, handle_donations, currency_totals)
             
             except KeyboardInterrupt:
                 print("\nStopping comment collection...")
                 for future in futures:
                     future.cancel()
                 executor.shutdown(wait=False)
-                return all_donations
+                return all_donations, currency_totals, donation_count
             
             except Exception as e:
                 print(f"Error fetching comments: {str(e)}")
                 for future in futures:
                     future.cancel()
-                return all_donations
+                return all_donations, currency_totals, donation_count
             
             finally:
                 # Ensure proper cleanup
@@ -191,17 +416,27 @@ def get_video_comments(url: str) -> List[Tuple[float, str, str, str]]:
         
         if count == 0:
             print("Warning: No comments were processed. The video might be unavailable or have no comments.")
-            return []
+            return [], {}, 0
             
+        # Fetching stops at the limit without asking YouTube for more, so a
+        # video with exactly max_comments comments is reported here too
+        if max_comments and count >= max_comments:
+            print(f"\nReached the max_comments limit of {max_comments} comments")
+        
         elapsed = time.time() - start_time
         rate = count / elapsed if elapsed > 0 else 0
         print(f"\nFinished processing {count} comments in {elapsed:.1f} seconds")
         print(f"Average processing rate: {rate:.1f} comments/sec")
-        return all_donations
+        return all_donations, currency_totals, donation_count
         
     except Exception as e:
         print(f'Error: {str(e)}')
-        return []
+        return [], {}, 0
+    
+    finally:
+        if writer:
+            donation_queue.put(None)
+            writer.join()
 
 def format_currency(amount: float, currency: str, original: str, author: str) -> str:
     """Format currency amounts with symbols"""
@@ -212,57 +447,70 @@ def format_currency(amount: float, currency: str, original: str, author: str) ->
     except Exception:
         return f"Error formatting amount for {author}"
 
+def analyze_video(url: str, refresh_rates: bool = False, stream_output: Optional[Path] = None) -> None:
+    """Find donations in a video's comments and print them with totals in USD"""
+    # Get exchange rates with fallback
+    rates = get_exchange_rates(refresh=refresh_rates)
+    
+    # Get and process comments; totals are summed while batches complete
+    donations, currency_totals, donation_count = get_video_comments(url, stream_output)
+    
+    if not donation_count:
+        print("\nNo valid donations found in comments.")
+        return
+    
+    # Show individual donations
+    if stream_output:
+        print(f"\nDonations written to: {stream_output}")
+    else:
+        print("\nExtracted donations:")
+        print("-" * 50)
+        # One write for the whole list rather than a print per donation
+        print("\n".join(format_currency(*donation) for donation in donations))
+    
+    print("\nTotals by currency:")
+    print("-" * 50)
+    total_usd = 0.0
+    
+    for currency, total in sorted(currency_totals.items()):
+        if currency == 'USD':
+            print(f"USD: ${total:.2f}")
+        elif currency == 'INR':
+            print(f"INR: ₹{total:.2f}")
+        elif currency == 'EUR':
+            print(f"EUR: €{total:.2f}")
+        else:
+            print(f"{currency}: {total:.2f}")
+        
+        # Convert to USD
+        usd_amount = total / rates.get(currency, 1.0)
+        total_usd += usd_amount
+        print(f"  = ${usd_amount:.2f} USD")
+    
+    print("\nSummary:")
+    print("-" * 50)
+    print(f"Total donations found: {donation_count}")
+    print(f"Total value in USD: ${total_usd:.2f}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Analyze YouTube video comments for donations")
+    parser.add_argument('url', help="YouTube video URL")
+    parser.add_argument('--refresh-rates', action='store_true',
+                        help="Ignore cached exchange rates and fetch fresh ones")
+    parser.add_argument('--output', type=Path, metavar='PATH',
+                        help="Stream individual donations to a JSONL file instead of keeping them in memory")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Log each donation as it is found")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format=LOG_FORMAT)
+    
     print("\nYouTube Donation Analyzer")
     print("=" * 50)
     print("Press Ctrl+C to stop collecting comments at any time\n")
     
     try:
-        # Get exchange rates with fallback
-        rates = get_exchange_rates()
-        
-        # Get and process comments
-        donations = get_video_comments(VIDEO_URL)
-        
-        if not donations:
-            print("\nNo valid donations found in comments.")
-            return
-        
-        # Show individual donations
-        print("\nExtracted donations:")
-        print("-" * 50)
-        for amount, currency, original, author in donations:
-            print(format_currency(amount, currency, original, author))
-        
-        # Calculate and show totals
-        currency_totals = {}
-        for amount, currency, _, _ in donations:
-            currency_totals[currency] = currency_totals.get(currency, 0) + amount
-        
-        print("\nTotals by currency:")
-        print("-" * 50)
-        total_usd = 0.0
-        
-        for currency, total in sorted(currency_totals.items()):
-            if currency == 'USD':
-                print(f"USD: ${total:.2f}")
-            elif currency == 'INR':
-                print(f"INR: ₹{total:.2f}")
-            elif currency == 'EUR':
-                print(f"EUR: €{total:.2f}")
-            else:
-                print(f"{currency}: {total:.2f}")
-            
-            # Convert to USD
-            usd_amount = total / rates.get(currency, 1.0)
-            total_usd += usd_amount
-            print(f"  = ${usd_amount:.2f} USD")
-        
-        print("\nSummary:")
-        print("-" * 50)
-        print(f"Total donations found: {len(donations)}")
-        print(f"Total value in USD: ${total_usd:.2f}")
-    
+        analyze_video(args.url, refresh_rates=args.refresh_rates, stream_output=args.output)
     except KeyboardInterrupt:
         print("\nStopping analysis...")
     except Exception as e: